@@ -1,22 +1,40 @@
+import asyncio
+import logging
+import os
 from typing import Optional
 from contextlib import asynccontextmanager
 
+import orjson
+import uvicorn
 from bson import ObjectId
-from fastapi import FastAPI
+from bson.errors import InvalidId
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from .db import Database
-from pydantic import BaseModel
+from .loaders import QuestionLoader
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+logger = logging.getLogger(__name__)
 
 class FormInternal(BaseModel):
     title: str
     description: str
     author: str
+    name: Optional[str] = None
 
     class Config:
         populate_by_name = True
      
-class Option(BaseModel):
+# A TypedDict rather than a model: pydantic validates options straight into
+# plain dicts, without building and later dumping a model per option
+class Option(TypedDict):
     option: str
     is_correct: bool
         
@@ -28,8 +46,20 @@ class QuestionInternal(BaseModel):
 
     class Config:
         populate_by_name = True
+
+# Dumps an already-validated request body to plain dicts in one pass
+QUESTION_LIST_ADAPTER = TypeAdapter(list[QuestionInternal])
         
-        
+# Fields returned to clients by /forms/get
+FORM_PROJECTION = {"title": 1, "description": 1, "author": 1, "name": 1}
+QUESTION_PROJECTION = {"index": 1, "question": 1, "type": 1, "options": 1, "_id": 0}
+
+# Most forms /forms/get_batch will look up in one request
+MAX_BATCH_FORMS = 100
+
+# Seconds a cached /forms/get response stays in Redis after it is stored. Reads
+# don't extend it, so an entry left stale by a read racing a write still expires.
+FORM_CACHE_TTL = 300
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -37,20 +67,48 @@ async def lifespan(app: FastAPI):
     app.db = Database(uri="mongodb://localhost:27017", db_name="hpquiz")
     print("Connected to database.")
     
+    # Ensure indexes exist (no-op if they already do). Names are optional, so the
+    # unique index is sparse and forms without one don't collide. The compound
+    # questions index backs both the $lookup join and its sort on index.
+    await app.db.get_collection("forms").create_index("name", unique=True, sparse=True)
+    await app.db.get_collection("questions").create_index([("form_id", ASCENDING), ("index", ASCENDING)])
+    
+    # Create connection to the cache, serving straight from Mongo if it is unavailable
+    app.redis = Redis(host="localhost", port=6379)
+    try:
+        await app.redis.ping()
+        print("Connected to cache.")
+    except RedisError:
+        await app.redis.aclose()
+        app.redis = None
+        print("Cache unavailable, continuing without it.")
+    
     yield
     
     # Close after the application is done running
-    app.db.client.close()
+    await app.db.client.close()
+    if app.redis is not None:
+        await app.redis.aclose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+def get_db(request: Request) -> Database:
+    return request.app.db
 
-app = FastAPI(lifespan=lifespan)
-# app = FastAPI()
-db: Database = app.db
+def get_cache(request: Request) -> Optional[Redis]:
+    return request.app.redis
 
-# Configure CORS
+def get_question_loader(db: Database = Depends(get_db)) -> QuestionLoader:
+    # Per request, so its memoised results never outlive the request
+    return QuestionLoader(db, projection=QUESTION_PROJECTION)
+
+# Configure CORS. The API is public and uses no cookies or auth headers, so
+# credentials stay off: browsers reject "*" with credentials anyway, and without
+# them the middleware sends a static "*" instead of echoing each request's Origin.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allows all origins
-    allow_credentials=True,
+    allow_credentials=False,
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
@@ -59,37 +117,202 @@ app.add_middleware(
 async def root():
     return {"message": "Welcome to the HP Quiz API"}
 
+def parse_object_id(value: str) -> ObjectId:
+    """
+    Coerce a client-supplied id to an ObjectId so queries hit the _id index,
+    rejecting malformed ids with a 400.
+    """
+    
+    try:
+        return ObjectId(value)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid id: {value!r}.")
+
+def form_pipeline(match: dict) -> list[dict]:
+    """
+    Build the aggregation that fetches a form together with its questions
+    (sorted by index) in a single round-trip.
+    """
+    
+    return [
+        {"$match": match},
+        {"$limit": 1},
+        {
+            "$lookup": {
+                "from": "questions",
+                "localField": "_id",
+                "foreignField": "form_id",
+                "as": "questions",
+                # Project first so later stages only carry the public fields
+                "pipeline": [
+                    {"$project": QUESTION_PROJECTION},
+                    {"$sort": {"index": ASCENDING}},
+                ],
+            }
+        },
+    ]
+
+def form_cache_key(id: Optional[str] = None, name: Optional[str] = None) -> str:
+    return f"form:id:{id}" if id else f"form:name:{name}"
+
+# The cache is best-effort: if Redis fails mid-request, log it and carry on
+# as if there were no cache rather than failing the request.
+
+async def cache_get(cache: Optional[Redis], key: str) -> Optional[bytes]:
+    if cache is None:
+        return None
+    
+    try:
+        return await cache.get(key)
+    except RedisError:
+        logger.warning("Cache read failed for %s", key, exc_info=True)
+        return None
+
+async def cache_set(cache: Optional[Redis], key: str, content: bytes):
+    if cache is None:
+        return
+    
+    try:
+        await cache.set(key, content, ex=FORM_CACHE_TTL)
+    except RedisError:
+        logger.warning("Cache write failed for %s", key, exc_info=True)
+
+async def invalidate_form_cache(cache: Optional[Redis], form_id: str, name: Optional[str] = None):
+    """
+    Drop the cached /forms/get responses for a form, by id and (if known) by name.
+    Runs after the write has committed, so a Redis failure is logged, not raised.
+    """
+    
+    if cache is None:
+        return
+    
+    keys = [form_cache_key(id=form_id)]
+    if name:
+        keys.append(form_cache_key(name=name))
+    try:
+        await cache.delete(*keys)
+    except RedisError:
+        logger.warning("Cache invalidation failed for %s", keys, exc_info=True)
+
+def stringify_ids(form: dict) -> dict:
+    """
+    Convert the ObjectId on a form to a string, in place, so the document can
+    be handed straight to orjson. Questions are projected without their _id.
+    """
+    
+    form["_id"] = str(form["_id"])
+    return form
+
 @app.get("/forms/get")
-async def form(id: Optional[str], name: Optional[str]):
+async def form(
+    id: Optional[str] = None,
+    name: Optional[str] = None,
+    db: Database = Depends(get_db),
+    cache: Optional[Redis] = Depends(get_cache),
+):
     if not id and not name:
-        raise ValueError("Either 'id' or 'name' must be provided.")
+        raise HTTPException(status_code=400, detail="Either 'id' or 'name' must be provided.")
     
     if id:
-        # Retrieve form first and then questions
-        form = db.find_one("forms", {"_id": id})
-        questions = db.find("questions", {"form_id": id}, sort_key="index")
-        
-        form["questions"] = questions
-        
-    elif name:
-        # Retrieve form first and then questions
-        form = db.find_one("forms", {"name": name})
-        questions = db.find("questions", {"form_id": form["_id"]}, sort_key="index")
-        
-        form["questions"] = questions
+        # Key the cache on the canonical id so writes can invalidate it
+        object_id = parse_object_id(id)
+        match, key = {"_id": object_id}, form_cache_key(id=str(object_id))
+    else:
+        match, key = {"name": name}, form_cache_key(name=name)
+    
+    cached = await cache_get(cache, key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    # Retrieve form and its questions in one aggregation
+    forms = await db.aggregate("forms", form_pipeline(match), projection={**FORM_PROJECTION, "questions": 1})
+    
+    if not forms:
+        raise HTTPException(status_code=404, detail="Form not found.")
+    
+    content = orjson.dumps(stringify_ids(forms[0]))
+    await cache_set(cache, key, content)
         
-    return form
+    return Response(content=content, media_type="application/json")
+
+@app.get("/forms/get_batch")
+async def form_batch(
+    ids: list[str] = Query(..., max_length=MAX_BATCH_FORMS),
+    db: Database = Depends(get_db),
+    question_loader: QuestionLoader = Depends(get_question_loader),
+):
+    # Drop repeated ids (keeping request order) so each form is fetched and returned once
+    object_ids = list(dict.fromkeys(parse_object_id(id) for id in ids))
+    
+    # One query for the forms; the loader coalesces their questions into one more
+    forms = await db.find_many_by_ids("forms", object_ids, projection=FORM_PROJECTION)
+    forms_by_id = {form["_id"]: form for form in forms}
+    found = [forms_by_id[object_id] for object_id in object_ids if object_id in forms_by_id]
+    
+    questions = await asyncio.gather(*(question_loader.load(form["_id"]) for form in found))
+    
+    result = []
+    for form, form_questions in zip(found, questions):
+        form["questions"] = form_questions
+        result.append(stringify_ids(form))
+    
+    return ORJSONResponse(result)
 
 @app.post("/forms/create")
-async def create_form(form_data: FormInternal):
-    # Make _id None to let MongoDB generate a new ObjectId
-    form_data.id = None
-    form = db.insert_one("forms", form_data.model_dump())
-    return form
+async def create_form(
+    form_data: FormInternal,
+    db: Database = Depends(get_db),
+    cache: Optional[Redis] = Depends(get_cache),
+):
+    # FormInternal has no _id, so MongoDB generates a new ObjectId
+    data = form_data.model_dump(exclude_none=True)
+    try:
+        form = await db.insert_one("forms", data)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail=f"A form named {data['name']!r} already exists.")
+    form_id = str(form.inserted_id)
+    await invalidate_form_cache(cache, form_id, data.get("name"))
+    return {"_id": form_id}
 
 @app.post("/forms/create/question")
-async def create_question(form_id: str, question_data: list[QuestionInternal]):
-    data = [{**question.model_dump(), "form_id": form_id} for question in question_data]
-    db.insert_many("questions", data)
+async def create_question(
+    form_id: str,
+    question_data: list[QuestionInternal],
+    db: Database = Depends(get_db),
+    cache: Optional[Redis] = Depends(get_cache),
+):
+    # Store form_id as an ObjectId so it joins against forms._id
+    form_object_id = parse_object_id(form_id)
     
-    return {"message": "Questions created successfully."}
\ No newline at end of file
+    # Refuse to insert orphaned questions
+    form = await db.find_one("forms", {"_id": form_object_id}, projection={"name": 1})
+    if form is None:
+        raise HTTPException(status_code=404, detail="Form not found.")
+    
+    # The body was validated on the way in, so dump it without rebuilding each dict
+    data = QUESTION_LIST_ADAPTER.dump_python(question_data)
+    for question in data:
+        question["form_id"] = form_object_id
+    await db.insert_many("questions", data)
+    
+    await invalidate_form_cache(cache, str(form_object_id), form.get("name"))
+    
+    return {"message": "Questions created successfully."}
+
+def main():
+    # One worker per core. "auto" picks uvloop and httptools (installed by
+    # uvicorn[standard]) wherever they are available, e.g. not uvloop on Windows.
+    # Access logging is off since it costs a logging call per request.
+    uvicorn.run(
+        "hpquiz.backend.app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="auto",
+        http="auto",
+        log_level="warning",
+        access_log=False,
+    )
+
+if __name__ == "__main__":
+    main()
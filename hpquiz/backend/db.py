@@ -1,16 +1,18 @@
-from typing import Any, Callable, Literal, Union
+from typing import Any, Awaitable, Callable, Literal, Optional, Union
 
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.client_session import ClientSession
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient
+from pymongo.asynchronous.client_session import AsyncClientSession
+from pymongo.asynchronous.collection import AsyncCollection
 
 
 
 class Database:
     """
     A class to represent a MongoDB database connection and operations.
+    All operations are coroutines backed by PyMongo's async API, so they never block the event loop.
     Attributes:
     -----------
-    client : MongoClient
+    client : AsyncMongoClient
         The MongoDB client instance.
     db : Database
         The MongoDB database instance.
@@ -18,20 +20,29 @@ class Database:
     --------
     get_collection(name: str) -> Collection:
         Returns the collection with the given name.
-    execute_with_session(operations: Callable[[ClientSession], Any]) -> Any:
+    execute_with_session(operations: Callable[[AsyncClientSession], Awaitable[Any]]) -> Any:
         Executes the given operations within a session and transaction.
+    transaction(operations: Callable[[AsyncClientSession], Awaitable[Any]]) -> Any:
+        Executes a multi-document workflow atomically.
     insert_one(collection_name: str, data: Any) -> InsertOneResult:
         Inserts a single document into the specified collection.
-    find_one(collection_name: str, query: dict) -> Optional[dict]:
+    find_one(collection_name: str, query: dict, projection: dict = None) -> Optional[dict]:
         Finds a single document in the specified collection that matches the query.
     update_one(collection_name: str, query: dict, update: dict) -> UpdateResult:
         Updates a single document in the specified collection that matches the query.
     delete_one(collection_name: str, query: dict) -> DeleteResult:
         Deletes a single document in the specified collection that matches the query.
+    aggregate(collection_name: str, pipeline: list[dict], projection: dict = None) -> list:
+        Runs an aggregation pipeline on the specified collection.
+    stream(collection_name: str, query: dict, ...) -> AsyncIterator[dict]:
+        Yields the documents matching the query as the cursor fetches them.
+    find_many_by_ids(collection_name: str, ids: list, projection: dict = None) -> list:
+        Finds all documents whose _id is in the given list with a single query.
     """
     def __init__(self, uri: str, db_name: str):
-        self.client = MongoClient(uri)
+        self.client = AsyncMongoClient(uri)
         self.db = self.client[db_name]
+        self._collections: dict[str, AsyncCollection] = {}
 
     def get_collection(self, name: str):
         """
@@ -42,77 +53,110 @@ class Database:
             Collection: The collection object corresponding to the given name.
         """
         
-        return self.db[name]
+        # Collection objects are built on every self.db[name], so reuse them
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = self.db[name]
+        return collection
 
-    def execute_with_session(self, operations: Callable[[ClientSession], Any]):
+    async def execute_with_session(self, operations: Callable[[AsyncClientSession], Awaitable[Any]]):
         """
         Executes a series of database operations within a session and transaction.
         This method starts a new client session and transaction, then executes the
         provided operations within that context. The operations should be a callable
-        that accepts a ClientSession object and performs the necessary database actions.
+        that accepts a session object and performs the necessary database actions.
         Args:
-            operations (Callable[[ClientSession], Any]): A callable that takes a 
-            ClientSession as an argument and performs database operations.
+            operations (Callable[[AsyncClientSession], Awaitable[Any]]): A coroutine function that
+            takes a session as an argument and performs database operations.
         Returns:
             Any: The result of the operations callable.
         """
         
-        with self.client.start_session() as session:
-            with session.start_transaction():
-                return operations(session)
+        async with self.client.start_session() as session:
+            async with await session.start_transaction():
+                return await operations(session)
 
-    def insert_one(self, collection_name: str, data: Any):
+    async def transaction(self, operations: Callable[[AsyncClientSession], Awaitable[Any]]):
+        """
+        Executes a multi-document workflow atomically.
+        Single-document reads and writes are atomic in MongoDB on their own, so only
+        workflows that must commit several writes together should go through here.
+        Transactions require MongoDB to be running as a replica set. Pass the session
+        on to each Database call, e.g. transaction(lambda session: db.insert_one(..., session=session)).
+        Args:
+            operations (Callable[[AsyncClientSession], Awaitable[Any]]): A coroutine function that
+            takes a session as an argument and performs database operations.
+        Returns:
+            Any: The result of the operations callable.
+        """
+        
+        return await self.execute_with_session(operations)
+
+    async def insert_one(self, collection_name: str, data: Any, session: Optional[AsyncClientSession] = None):
         """
         Inserts a single document into the specified collection.
         Args:
             collection_name (str): The name of the collection where the document will be inserted.
             data (Any): The document to be inserted.
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
         Returns:
             InsertOneResult: The result of the insert operation.
         Raises:
             Exception: If the insert operation fails.
         """
         
-        return self.execute_with_session(lambda session: self.get_collection(collection_name).insert_one(data, session=session))
+        return await self.get_collection(collection_name).insert_one(data, session=session)
 
-    def find_one(self, collection_name: str, query: dict):
+    async def find_one(self, collection_name: str, query: dict, projection: Optional[dict] = None, session: Optional[AsyncClientSession] = None):
         """
         Find a single document in the specified collection that matches the query.
         Args:
             collection_name (str): The name of the collection to search in.
             query (dict): The query criteria to match documents against.
+            projection (dict, optional): The fields to include or exclude from the result. Defaults to None (all fields).
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
         Returns:
             dict: The first document that matches the query criteria, or None if no document matches.
         """
         
-        return self.execute_with_session(lambda session: self.get_collection(collection_name).find_one(query, session=session))
+        return await self.get_collection(collection_name).find_one(query, projection=projection, session=session)
 
-    def update_one(self, collection_name: str, query: dict, update: dict):
+    async def update_one(self, collection_name: str, query: dict, update: dict, session: Optional[AsyncClientSession] = None):
         """
         Update a single document in the specified collection.
         Args:
             collection_name (str): The name of the collection to update.
             query (dict): The query to match the document to update.
             update (dict): The update operations to apply to the matched document.
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
         Returns:
             pymongo.results.UpdateResult: The result of the update operation.
         """
         
-        return self.execute_with_session(lambda session: self.get_collection(collection_name).update_one(query, update, session=session))
+        return await self.get_collection(collection_name).update_one(query, update, session=session)
 
-    def delete_one(self, collection_name: str, query: dict):
+    async def delete_one(self, collection_name: str, query: dict, session: Optional[AsyncClientSession] = None):
         """
         Deletes a single document from the specified collection that matches the given query.
         Args:
             collection_name (str): The name of the collection from which to delete the document.
             query (dict): The query used to match the document to be deleted.
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
         Returns:
             pymongo.results.DeleteResult: The result of the delete operation.
         """
         
-        return self.execute_with_session(lambda session: self.get_collection(collection_name).delete_one(query, session=session))
+        return await self.get_collection(collection_name).delete_one(query, session=session)
+    
+    def _find_cursor(self, collection_name: str, query: dict, sort_key: Optional[str], order: Union[Literal[1], Literal[-1]], projection: Optional[dict], limit: int, session: Optional[AsyncClientSession]):
+        cursor = self.get_collection(collection_name).find(query, projection=projection, session=session)
+        if sort_key:
+            cursor = cursor.sort(sort_key, order)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
     
-    def find(self, collection_name: str, query: dict, sort_key: str = None, order: Union[Literal[1], Literal[-1]] = ASCENDING):
+    async def find(self, collection_name: str, query: dict, sort_key: str = None, order: Union[Literal[1], Literal[-1]] = ASCENDING, projection: Optional[dict] = None, limit: int = 0, session: Optional[AsyncClientSession] = None):
         """
         Finds documents in a specified collection based on a query.
         Args:
@@ -120,25 +164,46 @@ class Database:
             query (dict): The query to filter documents.
             sort_key (str, optional): The key to sort the results by. Defaults to None.
             order (Union[Literal[1], Literal[-1]], optional): The order of sorting, either ascending (1) or descending (-1). Defaults to ASCENDING[1].
+            projection (dict, optional): The fields to include or exclude from each result. Defaults to None (all fields).
+            limit (int, optional): The maximum number of documents to return, applied server-side. Defaults to 0 (no limit).
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
         Returns:
             list: A list of documents that match the query.
         """
         
-        def find_operation(session):
-            cursor = self.get_collection(collection_name).find(query, session=session)
-            if sort_key:
-                cursor = cursor.sort(sort_key)
-            return cursor
-            
-        return list(self.execute_with_session(find_operation))
+        cursor = self._find_cursor(collection_name, query, sort_key, order, projection, limit, session)
+        return await cursor.to_list(length=None)
     
-    def insert_many(self, collection_name: str, data: list[Any]):
+    async def stream(self, collection_name: str, query: dict, sort_key: str = None, order: Union[Literal[1], Literal[-1]] = ASCENDING, projection: Optional[dict] = None, limit: int = 0, session: Optional[AsyncClientSession] = None):
+        """
+        Like find, but yields documents as the cursor fetches them instead of building a list.
+        Use this when the caller processes documents one at a time, to keep memory flat on large results.
+        Args:
+            collection_name (str): The name of the collection to search in.
+            query (dict): The query to filter documents.
+            sort_key (str, optional): The key to sort the results by. Defaults to None.
+            order (Union[Literal[1], Literal[-1]], optional): The order of sorting, either ascending (1) or descending (-1). Defaults to ASCENDING[1].
+            projection (dict, optional): The fields to include or exclude from each result. Defaults to None (all fields).
+            limit (int, optional): The maximum number of documents to return, applied server-side. Defaults to 0 (no limit).
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
+        Yields:
+            dict: Each document that matches the query.
+        """
+        
+        cursor = self._find_cursor(collection_name, query, sort_key, order, projection, limit, session)
+        async for document in cursor:
+            yield document
+    
+    async def insert_many(self, collection_name: str, data: list[Any], ordered: bool = False, session: Optional[AsyncClientSession] = None):
         """
         Inserts multiple documents into the specified collection.
 
         Args:
             collection_name (str): The name of the collection where the documents will be inserted.
             data (List[Any]): The list of documents to be inserted.
+            ordered (bool, optional): Whether to insert serially and stop at the first error. Defaults to False,
+            letting the server apply independent inserts in any order and report every failure at the end.
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
 
         Returns:
             InsertManyResult: The result of the insert operation.
@@ -146,6 +211,36 @@ class Database:
         Raises:
             Exception: If the insert operation fails.
         """
-        return self.execute_with_session(
-            lambda session: self.get_collection(collection_name).insert_many(data, session=session)
-        )
\ No newline at end of file
+        return await self.get_collection(collection_name).insert_many(data, ordered=ordered, session=session)
+    
+    async def aggregate(self, collection_name: str, pipeline: list[dict], projection: Optional[dict] = None, session: Optional[AsyncClientSession] = None):
+        """
+        Runs an aggregation pipeline on the specified collection.
+        Args:
+            collection_name (str): The name of the collection to aggregate on.
+            pipeline (list[dict]): The aggregation stages to run.
+            projection (dict, optional): If given, appended as a final $project stage. Defaults to None.
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
+        Returns:
+            list: The documents produced by the pipeline.
+        """
+        
+        if projection:
+            pipeline = [*pipeline, {"$project": projection}]
+        
+        cursor = await self.get_collection(collection_name).aggregate(pipeline, session=session)
+        return await cursor.to_list(length=None)
+    
+    async def find_many_by_ids(self, collection_name: str, ids: list[Any], projection: Optional[dict] = None, session: Optional[AsyncClientSession] = None):
+        """
+        Finds all documents whose _id is in the given list, in one round-trip.
+        Args:
+            collection_name (str): The name of the collection to search in.
+            ids (list[Any]): The _id values to fetch.
+            projection (dict, optional): The fields to include or exclude from each result. Defaults to None (all fields).
+            session (AsyncClientSession, optional): Run as part of this session, e.g. inside transaction(). Defaults to None.
+        Returns:
+            list: The matching documents, in no particular order. Missing ids are skipped.
+        """
+        
+        return await self.find(collection_name, {"_id": {"$in": ids}}, projection=projection, session=session)
@@ -0,0 +1,115 @@
+import asyncio
+import functools
+from typing import Any, Optional
+
+from .db import Database
+
+
+
+class QuestionLoader:
+    """
+    Batches question lookups for many forms into a single query, DataLoader style.
+    Every load() made during the same event-loop tick is collected, then resolved
+    by one find on form_id $in [...]; results are memoised per form for the life
+    of the loader, so create one per request.
+    Attributes:
+    -----------
+    db : Database
+        The database to load questions from.
+    projection : dict
+        The question fields to return (an inclusion or exclusion projection), or None for all fields.
+    Methods:
+    --------
+    load(form_id: Any) -> Awaitable[list[dict]]:
+        Returns a future resolving to the questions of the form, sorted by index.
+    """
+    def __init__(self, db: Database, projection: Optional[dict] = None):
+        self.db = db
+        self.projection = projection
+        self._query_projection, self._strip_form_id = self._with_form_id(projection)
+        self._futures: dict[Any, asyncio.Future] = {}
+        self._pending: list[Any] = []
+        self._dispatches: set[asyncio.Task] = set()
+
+    def load(self, form_id: Any) -> "asyncio.Future[list[dict]]":
+        """
+        Queue a form's questions to be fetched with the current batch.
+        Args:
+            form_id (Any): The _id of the form whose questions to load.
+        Returns:
+            asyncio.Future: Resolves to the form's questions, sorted by index.
+            Cancelling it only cancels this caller's wait, not the shared load.
+        """
+        
+        future = self._futures.get(form_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[form_id] = loop.create_future()
+            self._pending.append(form_id)
+            
+            # Dispatch once the loads queued in this tick have all been made
+            if len(self._pending) == 1:
+                loop.call_soon(self._schedule_dispatch)
+        
+        # The memoised future is shared by every caller for this form
+        return asyncio.shield(future)
+
+    @staticmethod
+    def _with_form_id(projection: Optional[dict]) -> tuple[Optional[dict], bool]:
+        """
+        Make sure the query returns form_id, which results are grouped by.
+        Returns the projection to query with, and whether form_id has to be
+        stripped from results because the caller's projection left it out.
+        """
+        
+        if not projection:
+            return None, False
+        
+        if all(value in (0, False) for value in projection.values()):
+            # Exclusion projections already return form_id unless they exclude it
+            if "form_id" not in projection:
+                return projection, False
+            return {key: value for key, value in projection.items() if key != "form_id"} or None, True
+        
+        if projection.get("form_id") not in (None, 0, False):
+            return projection, False
+        return {**projection, "form_id": 1}, True
+
+    def _schedule_dispatch(self):
+        form_ids, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._dispatch(form_ids))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+        task.add_done_callback(functools.partial(self._settle, form_ids))
+
+    def _settle(self, form_ids: list[Any], task: asyncio.Task):
+        # Runs however the dispatch ended, including cancellation before it
+        # started, so a failed batch never leaves its waiters hanging. Failed
+        # futures are dropped so the next load() of those forms queries again.
+        if not task.cancelled() and task.exception() is None:
+            return
+        
+        for form_id in form_ids:
+            future = self._futures.pop(form_id)
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            else:
+                future.set_exception(task.exception())
+
+    async def _dispatch(self, form_ids: list[Any]):
+        questions_by_form = {form_id: [] for form_id in form_ids}
+        async for question in self.db.stream(
+            "questions",
+            {"form_id": {"$in": form_ids}},
+            sort_key="index",
+            projection=self._query_projection,
+        ):
+            form_id = question.pop("form_id") if self._strip_form_id else question["form_id"]
+            questions_by_form[form_id].append(question)
+        
+        for form_id, questions in questions_by_form.items():
+            future = self._futures[form_id]
+            if not future.done():
+                future.set_result(questions)
@@ -0,0 +1,232 @@
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+from redis.exceptions import ConnectionError
+
+from hpquiz.backend.app import MAX_BATCH_FORMS, app, form_cache_key, get_cache, get_db
+
+
+class FakeDatabase:
+    """
+    In-memory stand-in for Database, covering the calls the routes make.
+    """
+    def __init__(self):
+        self.forms: dict[ObjectId, dict] = {}
+        self.questions: list[dict] = []
+        self.calls: list[str] = []
+
+    def add_form(self, name: str = None, questions: int = 0) -> ObjectId:
+        _id = ObjectId()
+        self.forms[_id] = {"_id": _id, "title": "Form", "description": "Form", "author": "Name"}
+        if name:
+            self.forms[_id]["name"] = name
+        for index in reversed(range(questions)):
+            self.questions.append(
+                {"_id": ObjectId(), "form_id": _id, "index": index, "question": f"q{index}", "type": "text", "options": []}
+            )
+        return _id
+
+    def _questions_for(self, form_id: ObjectId) -> list[dict]:
+        questions = sorted((q for q in self.questions if q["form_id"] == form_id), key=lambda q: q["index"])
+        return [{key: value for key, value in q.items() if key not in ("_id", "form_id")} for q in questions]
+
+    async def aggregate(self, collection_name, pipeline, projection=None):
+        self.calls.append("aggregate")
+        (field, value), = pipeline[0]["$match"].items()
+        for form in self.forms.values():
+            if form.get(field) == value:
+                return [{**form, "questions": self._questions_for(form["_id"])}]
+        return []
+
+    async def find_many_by_ids(self, collection_name, ids, projection=None):
+        self.calls.append("find_many_by_ids")
+        return [dict(self.forms[_id]) for _id in ids if _id in self.forms]
+
+    async def stream(self, collection_name, query, sort_key=None, projection=None):
+        self.calls.append("stream")
+        for form_id in query["form_id"]["$in"]:
+            for question in self._questions_for(form_id):
+                yield {**question, "form_id": form_id}
+
+    async def find_one(self, collection_name, query, projection=None):
+        return self.forms.get(query["_id"])
+
+    async def insert_one(self, collection_name, data):
+        if "name" in data and any(form.get("name") == data["name"] for form in self.forms.values()):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        form_id = self.add_form(data.get("name"))
+
+        class Result:
+            inserted_id = form_id
+        return Result()
+
+    async def insert_many(self, collection_name, data):
+        self.questions.extend(data)
+
+
+class FakeCache:
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+
+class FailingCache:
+    async def get(self, key):
+        raise ConnectionError("Redis is down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("Redis is down")
+
+    async def delete(self, *keys):
+        raise ConnectionError("Redis is down")
+
+
+QUESTION = {"index": 0, "question": "New?", "type": "text", "options": [{"option": "Yes", "is_correct": True}]}
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def cache():
+    return FakeCache()
+
+
+@pytest.fixture
+def client(db, cache):
+    # Not entered as a context manager, so lifespan never connects anywhere
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_cache] = lambda: cache
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_get_form_by_id_includes_sorted_questions(client, db):
+    form_id = db.add_form(questions=2)
+
+    response = client.get("/forms/get", params={"id": str(form_id)})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["_id"] == str(form_id)
+    assert [question["index"] for question in body["questions"]] == [0, 1]
+
+
+def test_get_form_by_name(client, db):
+    form_id = db.add_form(name="potions")
+
+    response = client.get("/forms/get", params={"name": "potions"})
+
+    assert response.status_code == 200
+    assert response.json()["_id"] == str(form_id)
+
+
+@pytest.mark.parametrize(
+    "params, status",
+    [({}, 400), ({"id": "not-an-object-id"}, 400), ({"id": str(ObjectId())}, 404), ({"name": "missing"}, 404)],
+)
+def test_get_form_errors(client, params, status):
+    assert client.get("/forms/get", params=params).status_code == status
+
+
+def test_get_form_is_served_from_cache(client, db):
+    form_id = db.add_form()
+
+    first = client.get("/forms/get", params={"id": str(form_id)})
+    second = client.get("/forms/get", params={"id": str(form_id)})
+
+    assert first.json() == second.json()
+    assert db.calls == ["aggregate"]
+
+
+def test_create_question_invalidates_cached_form(client, db, cache):
+    form_id = db.add_form(name="charms")
+    client.get("/forms/get", params={"id": str(form_id)})
+    client.get("/forms/get", params={"name": "charms"})
+
+    response = client.post("/forms/create/question", params={"form_id": str(form_id)}, json=[QUESTION])
+
+    assert response.status_code == 200
+    assert cache.store == {}
+    assert client.get("/forms/get", params={"id": str(form_id)}).json()["questions"][0]["question"] == "New?"
+
+
+def test_create_question_for_missing_form_is_404(client, db):
+    response = client.post("/forms/create/question", params={"form_id": str(ObjectId())}, json=[QUESTION])
+
+    assert response.status_code == 404
+    assert db.questions == []
+
+
+def test_create_question_with_malformed_form_id_is_400(client):
+    assert client.post("/forms/create/question", params={"form_id": "nope"}, json=[QUESTION]).status_code == 400
+
+
+def test_create_form_returns_new_id(client, db):
+    response = client.post("/forms/create", json={"title": "T", "description": "D", "author": "A"})
+
+    assert response.status_code == 200
+    assert ObjectId(response.json()["_id"]) in db.forms
+
+
+def test_create_form_with_duplicate_name_is_409(client, db):
+    db.add_form(name="potions")
+
+    response = client.post("/forms/create", json={"title": "T", "description": "D", "author": "A", "name": "potions"})
+
+    assert response.status_code == 409
+
+
+@pytest.mark.parametrize("failing_cache", [None, FailingCache()], ids=["no-cache", "redis-error"])
+def test_routes_work_without_a_working_cache(client, db, failing_cache):
+    app.dependency_overrides[get_cache] = lambda: failing_cache
+    form_id = db.add_form(name="herbology")
+
+    assert client.get("/forms/get", params={"id": str(form_id)}).status_code == 200
+    assert client.get("/forms/get", params={"id": str(form_id)}).status_code == 200
+    assert client.post("/forms/create/question", params={"form_id": str(form_id)}, json=[QUESTION]).status_code == 200
+    assert client.post("/forms/create", json={"title": "T", "description": "D", "author": "A"}).status_code == 200
+    assert db.calls == ["aggregate", "aggregate"]
+
+
+def test_get_batch_keeps_request_order_and_deduplicates(client, db):
+    first, second = db.add_form(questions=1), db.add_form(questions=2)
+    missing = ObjectId()
+
+    response = client.get("/forms/get_batch", params={"ids": [str(second), str(missing), str(first), str(second)]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [form["_id"] for form in body] == [str(second), str(first)]
+    assert [len(form["questions"]) for form in body] == [2, 1]
+    assert db.calls == ["find_many_by_ids", "stream"]
+
+
+def test_get_batch_rejects_too_many_ids(client, db):
+    ids = [str(ObjectId()) for _ in range(MAX_BATCH_FORMS + 1)]
+
+    assert client.get("/forms/get_batch", params={"ids": ids}).status_code == 422
+
+
+def test_get_batch_rejects_malformed_id(client):
+    assert client.get("/forms/get_batch", params={"ids": ["nope"]}).status_code == 400
+
+
+def test_cache_keys_use_canonical_id(client, db, cache):
+    form_id = db.add_form()
+
+    client.get("/forms/get", params={"id": str(form_id).upper()})
+
+    assert list(cache.store) == [form_cache_key(id=str(form_id))]
@@ -0,0 +1,203 @@
+import asyncio
+
+import pytest
+
+from hpquiz.backend.loaders import QuestionLoader
+
+
+def project(document: dict, projection: dict) -> dict:
+    """
+    Apply an inclusion or exclusion projection the way MongoDB does.
+    """
+
+    if not projection:
+        return dict(document)
+
+    include_id = projection.get("_id", 1)
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(fields.values()):
+        projected = {key: document[key] for key in fields if key in document}
+        if include_id and "_id" in document:
+            projected["_id"] = document["_id"]
+        return projected
+    if any(fields.values()):
+        raise ValueError("Cannot mix inclusion and exclusion in a projection")
+    return {key: value for key, value in document.items() if key not in fields and (include_id or key != "_id")}
+
+
+class StubDatabase:
+    """
+    Stands in for Database.stream, recording every query it is asked to run.
+    """
+    def __init__(self, questions: list[dict], error: Exception = None):
+        self.questions = questions
+        self.error = error
+        self.queries: list[dict] = []
+        self.projections: list[dict] = []
+
+    async def stream(self, collection_name, query, sort_key=None, projection=None):
+        self.queries.append(query)
+        self.projections.append(projection)
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+
+        form_ids = query["form_id"]["$in"]
+        for question in sorted(self.questions, key=lambda question: question[sort_key]):
+            if question["form_id"] in form_ids:
+                yield project(question, projection)
+
+
+QUESTIONS = [
+    {"_id": 1, "form_id": "a", "index": 1, "question": "a1"},
+    {"_id": 2, "form_id": "b", "index": 0, "question": "b0"},
+    {"_id": 3, "form_id": "a", "index": 0, "question": "a0"},
+]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_loads_in_one_tick_share_one_query():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        loader = QuestionLoader(db)
+        return await asyncio.gather(loader.load("a"), loader.load("b"))
+
+    run(main())
+    assert db.queries == [{"form_id": {"$in": ["a", "b"]}}]
+
+
+def test_results_are_per_form_and_sorted_by_index():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        loader = QuestionLoader(db, projection={"question": 1})
+        return await asyncio.gather(loader.load("b"), loader.load("a"))
+
+    b, a = run(main())
+    assert a == [{"_id": 3, "question": "a0"}, {"_id": 1, "question": "a1"}]
+    assert b == [{"_id": 2, "question": "b0"}]
+
+
+def test_inclusion_projection_keeps_requested_form_id():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        return await QuestionLoader(db, projection={"form_id": 1, "_id": 0}).load("b")
+
+    assert run(main()) == [{"form_id": "b"}]
+
+
+@pytest.mark.parametrize(
+    "projection, expected",
+    [
+        ({"_id": 0}, {"form_id": "b", "index": 0, "question": "b0"}),
+        ({"question": 0}, {"_id": 2, "form_id": "b", "index": 0}),
+        ({"form_id": 0, "_id": 0}, {"index": 0, "question": "b0"}),
+    ],
+)
+def test_exclusion_projection_is_not_mixed_with_form_id(projection, expected):
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        return await QuestionLoader(db, projection=projection).load("b")
+
+    assert run(main()) == [expected]
+    assert all(value in (0, False) for value in db.projections[0].values())
+
+
+def test_unknown_form_loads_empty_list():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        return await QuestionLoader(db).load("missing")
+
+    assert run(main()) == []
+
+
+def test_repeated_keys_are_deduplicated_and_memoised():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        loader = QuestionLoader(db)
+        first, again = await asyncio.gather(loader.load("a"), loader.load("a"))
+        later = await loader.load("a")
+        return first, again, later
+
+    first, again, later = run(main())
+    assert first == again == later
+    assert db.queries == [{"form_id": {"$in": ["a"]}}]
+
+
+def test_separate_ticks_dispatch_separate_queries():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        loader = QuestionLoader(db)
+        await loader.load("a")
+        await loader.load("b")
+
+    run(main())
+    assert db.queries == [{"form_id": {"$in": ["a"]}}, {"form_id": {"$in": ["b"]}}]
+
+
+def test_error_reaches_every_waiter():
+    db = StubDatabase(QUESTIONS, error=RuntimeError("boom"))
+
+    async def main():
+        loader = QuestionLoader(db)
+        return await asyncio.gather(loader.load("a"), loader.load("a"), loader.load("b"), return_exceptions=True)
+
+    results = run(main())
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_failed_load_is_retried_on_next_call():
+    db = StubDatabase(QUESTIONS, error=RuntimeError("boom"))
+
+    async def main():
+        loader = QuestionLoader(db)
+        with pytest.raises(RuntimeError):
+            await loader.load("a")
+        db.error = None
+        return await loader.load("a")
+
+    assert [question["question"] for question in run(main())] == ["a0", "a1"]
+    assert len(db.queries) == 2
+
+
+@pytest.mark.parametrize("ticks, queries", [(1, 1), (2, 2)], ids=["before-query", "mid-query"])
+def test_cancelled_dispatch_releases_waiters_and_allows_retry(ticks, queries):
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        loader = QuestionLoader(db)
+        waiter = loader.load("a")
+        for _ in range(ticks):
+            await asyncio.sleep(0)
+        for dispatch in loader._dispatches:
+            dispatch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, timeout=1)
+        return await asyncio.wait_for(loader.load("a"), timeout=1)
+
+    assert [question["question"] for question in run(main())] == ["a0", "a1"]
+    assert len(db.queries) == queries
+
+
+def test_cancelling_one_caller_does_not_affect_others():
+    db = StubDatabase(QUESTIONS)
+
+    async def main():
+        loader = QuestionLoader(db, projection={"question": 1})
+        cancelled, same_key, other_key = loader.load("a"), loader.load("a"), loader.load("b")
+        cancelled.cancel()
+        return await asyncio.gather(same_key, other_key)
+
+    a, b = run(main())
+    assert a == [{"_id": 3, "question": "a0"}, {"_id": 1, "question": "a1"}]
+    assert b == [{"_id": 2, "question": "b0"}]